@@ -9,11 +9,54 @@ import json
 import time
 import sys
 from typing import Any, Dict, List, Union
+import numpy as np
 
+# 延迟导入，处理可能的依赖缺失
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from .basic_stats import ArrayLike, _as_f64
 from .ml_advanced import AdvancedMLAlgorithms
 from .time_series import TimeSeriesAlgorithms
 from .nlp import NLPAlgorithms
 
+# Python版本在导入时确定，无需每次调用重新格式化
+_PY_VER = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
+
+# 响应统计信息模板
+_STATS_TEMPLATE: Dict[str, str] = {
+    "execution_time_ms": "0",
+    "python_version": _PY_VER,
+    "data_points": "0",
+    "algorithm": "",
+}
+
+
+def _dumps(result: Any) -> str:
+    """序列化算法结果为JSON字符串（优先使用orjson，原生支持NumPy类型）
+
+    两条路径输出一致：NaN/Inf统一编码为null。
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(_json_safe(result), allow_nan=False)
+
+def _json_safe(obj: Any) -> Any:
+    """标准库json的回退转换：NumPy数组/标量转为Python对象，非有限浮点数转为None（与orjson一致）"""
+    if isinstance(obj, dict):
+        return {k: _json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_json_safe(v) for v in obj]
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return _json_safe(obj.tolist())
+    if isinstance(obj, float) and not np.isfinite(obj):
+        return None
+    return obj
+
+
 class AlgorithmDispatcher:
     """主算法分发器"""
     
@@ -42,42 +85,45 @@ class AlgorithmDispatcher:
             "text_similarity": self.nlp_algorithms.text_similarity,
             "keyword_extraction": self.nlp_algorithms.keyword_extraction,
         }
+        
+        # 预计算分发表：算法名 -> 索引，索引 -> 实现函数
+        self._names = {name: i for i, name in enumerate(self._algorithms)}
+        self._fns = tuple(self._algorithms.values())
 
-    def analyze(self, algorithm: str, data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+    def analyze(self, algorithm: str, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
         """
         执行分析算法
         
         Args:
             algorithm: 算法名称
-            data: 输入数据
+            data: 输入数据（Rust端传入float64字节缓冲区，Python端可传列表或数组）
             params: 算法参数
             
         Returns:
             包含结果和统计信息的字典
         """
-        start_time = time.time()
+        t0 = time.perf_counter_ns()
         
-        if algorithm not in self._algorithms:
+        idx = self._names.get(algorithm, -1)
+        if idx < 0:
             raise ValueError(f"Algorithm '{algorithm}' not supported in Python implementation")
         
         try:
+            # 在边界处一次性转换为float64数组，算法内部不再重复转换
+            data = _as_f64(data)
+            
             # 执行算法
-            result = self._algorithms[algorithm](data, params)
+            result = self._fns[idx](data, params)
             
-            execution_time = (time.time() - start_time) * 1000  # 转换为毫秒
+            execution_time_ms = (time.perf_counter_ns() - t0) // 1_000_000
             
             # 构建响应
-            response = {
-                "result": json.dumps(result),
-                "stats": {
-                    "execution_time_ms": str(int(execution_time)),
-                    "python_version": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
-                    "data_points": str(len(data)),
-                    "algorithm": algorithm,
-                }
-            }
+            stats = _STATS_TEMPLATE.copy()
+            stats["execution_time_ms"] = str(execution_time_ms)
+            stats["data_points"] = str(len(data))
+            stats["algorithm"] = algorithm
             
-            return response
+            return {"result": _dumps(result), "stats": stats}
             
         except Exception as e:
             raise RuntimeError(f"Python algorithm '{algorithm}' failed: {str(e)}")
@@ -168,7 +214,7 @@ class AlgorithmDispatcher:
 _dispatcher = AlgorithmDispatcher()
 
 # 导出主要函数
-def analyze(algorithm: str, data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+def analyze(algorithm: str, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
     """主分析函数，供Rust端调用"""
     return _dispatcher.analyze(algorithm, data, params)
 
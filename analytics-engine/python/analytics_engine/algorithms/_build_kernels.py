@@ -0,0 +1,42 @@
+"""
+数值内核AOT预编译脚本
+
+在构建阶段使用numba.pycc将热点内核编译为扩展模块 _kernels_aot，
+运行时由 _kernels 优先加载，消除首次调用的JIT编译延迟。
+
+AOT为可选项：由打包步骤（scripts/build.sh 在 ANALYTICS_ENGINE_USE_AOT=1 时）
+在maturin构建wheel之前调用，生成的扩展模块随wheel分发；运行时同样需要设置
+ANALYTICS_ENGINE_USE_AOT=1 才会加载。
+
+用法：
+    python -m analytics_engine.algorithms._build_kernels
+
+并行批量内核（parallel=True）不支持AOT，仍在运行时JIT编译。
+numba.pycc已被标记为待弃用，构建时屏蔽其弃用警告。
+"""
+
+import os
+import warnings
+from pathlib import Path
+
+# 构建时必须使用JIT内核的原始实现（需要py_func），而不是已存在的AOT模块
+os.environ.pop("ANALYTICS_ENGINE_USE_AOT", None)
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    warnings.simplefilter("ignore", PendingDeprecationWarning)
+    from numba.pycc import CC
+
+from analytics_engine.algorithms import _kernels
+
+cc = CC("_kernels_aot")
+cc.output_dir = str(Path(__file__).resolve().parent)
+cc.verbose = True
+
+cc.export("moments_f64", "Tuple((i8, f8, f8, f8, f8, f8, f8))(f8[:])")(_kernels.moments_kernel.py_func)
+cc.export("logsum_f64", "f8(f8[:])")(_kernels.logsum_kernel.py_func)
+cc.export("recipsum_f64", "f8(f8[:])")(_kernels.recipsum_kernel.py_func)
+
+
+if __name__ == "__main__":
+    cc.compile()
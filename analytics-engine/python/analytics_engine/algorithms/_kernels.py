@@ -0,0 +1,303 @@
+"""
+数值内核模块
+
+为热点统计计算提供单次遍历的Numba JIT内核：
+- 一次内存扫描同时得到均值与二至四阶中心矩
+- 多序列批量摘要，行间并行、行内多路累加（路数按CPU指令集选择）
+- 几何/调和平均的对数和、倒数和，无需中间数组
+- Theil-Sen全部成对斜率，外层循环并行并直接写入预分配数组
+- 避免多次独立的NumPy归约带来的重复内存流量
+
+单序列的求和与极值直接使用NumPy归约：其SIMD实现快于手写循环，
+且NaN按IEEE语义传播。含极值或有效性判断的内核不使用fastmath
+（其假定输入无NaN，会改变比较结果）：NaN输入得到NaN而非错误。
+
+JIT内核以nogil模式编译，执行期间释放GIL，可在线程池中真正并行。
+AOT为可选项：设置环境变量 ANALYTICS_ENGINE_USE_AOT=1 且打包时生成了
+_kernels_aot 模块时才使用，可省去导入时的JIT预热；注意numba.pycc导出的
+函数不释放GIL，默认使用JIT版本。
+并行内核不支持AOT，首次调用时才JIT编译，不增加导入耗时。
+Numba不可用时回退到等价的NumPy实现。
+"""
+
+from typing import Tuple
+import math
+import os
+import platform
+import warnings
+import numpy as np
+
+# 延迟导入，处理可能的依赖缺失
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    warnings.warn("numba not available, falling back to NumPy kernels")
+
+
+def _detect_isa() -> str:
+    """检测宿主CPU的SIMD指令集（导入时执行一次）
+
+    优先使用llvmlite报告的宿主特性（即Numba实际编译目标），
+    其次使用py-cpuinfo，最后按平台架构推断。
+    """
+    flags = set()
+    try:
+        from llvmlite import binding as llvm
+        flags = {name for name, enabled in llvm.get_host_cpu_features().items() if enabled}
+    except Exception:
+        try:
+            import cpuinfo
+            flags = set(cpuinfo.get_cpu_info().get("flags", []))
+        except ImportError:
+            pass
+    
+    if "avx512f" in flags:
+        return "avx512"
+    if "avx2" in flags:
+        return "avx2"
+    if "neon" in flags or "asimd" in flags or platform.machine().lower() in ("arm64", "aarch64"):
+        return "neon"
+    return "scalar"
+
+
+# 每种指令集的累加器路数：两个向量寄存器宽度的float64，保证足够的指令级并行
+_ACCUMULATORS = {"avx512": 16, "avx2": 8, "neon": 4, "scalar": 4}
+
+SIMD_ISA = _detect_isa()
+_LANES = _ACCUMULATORS[SIMD_ISA]
+
+
+if NUMBA_AVAILABLE:
+    @njit(nogil=True, cache=True, boundscheck=False, inline="always")
+    def _row_summary(row):
+        """分块计算一维数组的 (sum, min, max)
+
+        主循环以_LANES路累加器处理完整块；末尾不足一块的部分作为掩码块处理：
+        越界通道读取单位元（求和取0，极值取row[0]），与主循环保持相同的
+        向量形状，无需标量收尾循环。整除时掩码块全部为单位元，结果不变。
+        极值遇到NaN即置为NaN并保持，与NumPy的min/max一致。
+        """
+        w = _LANES
+        n = row.shape[0]
+        lanes = n - n % w
+        acc_s = np.zeros(w)
+        acc_mn = np.full(w, row[0], dtype=np.float64)
+        acc_mx = np.full(w, row[0], dtype=np.float64)
+        for i in range(0, lanes, w):
+            for k in range(w):
+                v = row[i + k]
+                acc_s[k] += v
+                if v < acc_mn[k] or v != v:
+                    acc_mn[k] = v
+                if v > acc_mx[k] or v != v:
+                    acc_mx[k] = v
+        for k in range(w):
+            j = lanes + k
+            v = row[j] if j < n else row[0]
+            acc_s[k] += v if j < n else 0.0
+            if v < acc_mn[k] or v != v:
+                acc_mn[k] = v
+            if v > acc_mx[k] or v != v:
+                acc_mx[k] = v
+        # 通道归约同样显式传播NaN（Numba的数组min/max会跳过NaN）
+        mn = acc_mn[0]
+        mx = acc_mx[0]
+        for k in range(1, w):
+            if acc_mn[k] < mn or acc_mn[k] != acc_mn[k]:
+                mn = acc_mn[k]
+            if acc_mx[k] > mx or acc_mx[k] != acc_mx[k]:
+                mx = acc_mx[k]
+        return acc_s.sum(), mn, mx
+
+    @njit(nogil=True, cache=True, boundscheck=False, inline="always")
+    def _row_sq_dev(row, mean):
+        """分块计算离差平方和，尾部掩码块的越界通道离差取0"""
+        w = _LANES
+        n = row.shape[0]
+        lanes = n - n % w
+        acc = np.zeros(w)
+        for i in range(0, lanes, w):
+            for k in range(w):
+                d = row[i + k] - mean
+                acc[k] += d * d
+        for k in range(w):
+            j = lanes + k
+            d = (row[j] - mean) if j < n else 0.0
+            acc[k] += d * d
+        return acc.sum()
+
+
+if NUMBA_AVAILABLE:
+    @njit(nogil=True, cache=True, boundscheck=False)
+    def moments_kernel(a):
+        """单次遍历计算 (n, mean, M2, M3, M4, min, max)
+
+        M2/M3/M4为中心矩的离差幂和（未除以n），采用Welford/Terriberry
+        在线更新以保证数值稳定性。要求非空一维float64数组。
+        """
+        n = 0
+        mean = 0.0
+        m2 = 0.0
+        m3 = 0.0
+        m4 = 0.0
+        mn = a[0]
+        mx = a[0]
+        for i in range(a.shape[0]):
+            v = a[i]
+            n1 = n
+            n += 1
+            delta = v - mean
+            delta_n = delta / n
+            delta_n2 = delta_n * delta_n
+            term1 = delta * delta_n * n1
+            mean += delta_n
+            m4 += term1 * delta_n2 * (n * n - 3 * n + 3) + 6.0 * delta_n2 * m2 - 4.0 * delta_n * m3
+            m3 += term1 * delta_n * (n - 2) - 3.0 * delta_n * m2
+            m2 += term1
+            if v < mn or v != v:
+                mn = v
+            if v > mx or v != v:
+                mx = v
+        return n, mean, m2, m3, m4, mn, mx
+else:
+    def moments_kernel(a: np.ndarray) -> Tuple[int, float, float, float, float, float, float]:
+        """NumPy回退实现：计算 (n, mean, M2, M3, M4, min, max)"""
+        mean = float(np.mean(a))
+        d = a - mean
+        d2 = d * d
+        return (
+            len(a), mean,
+            float(np.sum(d2)), float(np.sum(d2 * d)), float(np.sum(d2 * d2)),
+            float(np.min(a)), float(np.max(a)),
+        )
+
+
+if NUMBA_AVAILABLE:
+    @njit(nogil=True, cache=True, boundscheck=False, parallel=True)
+    def batch_summary_kernel(a):
+        """按行批量计算 (sum, min, max, M2)，输入为 (n_series, n_points) 连续数组
+
+        行间并行；行内使用_LANES路独立累加器（编译期常量，按CPU指令集选择），
+        隐藏加法延迟并使LLVM生成对应宽度的SIMD代码，尾部以掩码块处理。
+        M2为离差平方和，第二遍扫描时该行通常仍在缓存中。
+        """
+        n_series, n = a.shape
+        out = np.empty((n_series, 4), dtype=np.float64)
+        for r in prange(n_series):
+            row = a[r]
+            s, mn, mx = _row_summary(row)
+            out[r, 0] = s
+            out[r, 1] = mn
+            out[r, 2] = mx
+            out[r, 3] = _row_sq_dev(row, s / n)
+        return out
+else:
+    def batch_summary_kernel(a: np.ndarray) -> np.ndarray:
+        """NumPy回退实现：按行计算 (sum, min, max, M2)"""
+        s = np.sum(a, axis=1)
+        d = a - (s / a.shape[1])[:, None]
+        return np.column_stack([s, np.min(a, axis=1), np.max(a, axis=1), np.sum(d * d, axis=1)])
+
+
+if NUMBA_AVAILABLE:
+    @njit(nogil=True, cache=True, boundscheck=False)
+    def logsum_kernel(a):
+        """单次遍历计算 sum(log(a))，遇到非正值抛出ValueError，NaN传播为结果"""
+        s = 0.0
+        for i in range(a.shape[0]):
+            v = a[i]
+            if v <= 0.0:
+                raise ValueError("Geometric mean requires positive values")
+            s += math.log(v)
+        return s
+
+    @njit(nogil=True, cache=True, boundscheck=False)
+    def recipsum_kernel(a):
+        """单次遍历计算 sum(1/a)，遇到零值抛出ValueError，NaN传播为结果"""
+        s = 0.0
+        for i in range(a.shape[0]):
+            v = a[i]
+            if v == 0.0:
+                raise ValueError("Harmonic mean undefined for zero values")
+            s += 1.0 / v
+        return s
+else:
+    def logsum_kernel(a: np.ndarray) -> float:
+        """NumPy回退实现：计算 sum(log(a))"""
+        if np.any(a <= 0):
+            raise ValueError("Geometric mean requires positive values")
+        return float(np.sum(np.log(a)))
+
+    def recipsum_kernel(a: np.ndarray) -> float:
+        """NumPy回退实现：计算 sum(1/a)"""
+        if np.any(a == 0):
+            raise ValueError("Harmonic mean undefined for zero values")
+        return float(np.sum(1.0 / a))
+
+
+if NUMBA_AVAILABLE:
+    @njit(nogil=True, cache=True, fastmath=True, boundscheck=False, parallel=True)
+    def pairwise_slopes_kernel(y):
+        """计算全部成对斜率 (y[j]-y[i])/(j-i), j>i，按(i, j)字典序写入长度n(n-1)/2的数组
+
+        外层循环并行；第i行的起始位置为 i*(2n-i-1)/2，各行写入区间互不重叠。
+        内层循环为连续访存，LLVM可自动向量化。
+        """
+        n = y.shape[0]
+        out = np.empty(n * (n - 1) // 2, dtype=np.float64)
+        for i in prange(n - 1):
+            base = i * (2 * n - i - 1) // 2 - i - 1
+            yi = y[i]
+            for j in range(i + 1, n):
+                out[base + j] = (y[j] - yi) / (j - i)
+        return out
+else:
+    # 回退实现的分块行数：n较大时按行分块，避免一次性分配n×n矩阵
+    _SLOPES_BLOCK_ROWS = 1024
+    _SLOPES_BLOCK_THRESHOLD = 4096
+
+    def pairwise_slopes_kernel(y: np.ndarray) -> np.ndarray:
+        """NumPy回退实现：按行分块广播，上三角掩码选出 j>i 的元素对"""
+        n = len(y)
+        idx = np.arange(n, dtype=np.float64)
+        block = _SLOPES_BLOCK_ROWS if n > _SLOPES_BLOCK_THRESHOLD else n
+        
+        slopes = np.empty(n * (n - 1) // 2, dtype=np.float64)
+        pos = 0
+        for i0 in range(0, n - 1, block):
+            i1 = min(i0 + block, n - 1)
+            # 行i ∈ [i0, i1)，列j ∈ [i0+1, n)；列偏移c >= 行偏移r 即 j > i
+            dy = y[None, i0 + 1:] - y[i0:i1, None]
+            mask = np.triu(np.ones(dy.shape, dtype=bool))
+            dx = idx[None, i0 + 1:] - idx[i0:i1, None]
+            block_slopes = dy[mask] / dx[mask]
+            slopes[pos:pos + block_slopes.size] = block_slopes
+            pos += block_slopes.size
+        return slopes
+
+
+# 显式启用时使用打包阶段AOT预编译的内核（见_build_kernels.py），导入即可用，无JIT延迟
+AOT_AVAILABLE = False
+if os.environ.get("ANALYTICS_ENGINE_USE_AOT") == "1":
+    try:
+        from . import _kernels_aot
+        AOT_AVAILABLE = True
+    except ImportError:
+        pass
+
+_warmup = np.zeros(1, dtype=np.float64)
+if AOT_AVAILABLE:
+    moments_kernel = _kernels_aot.moments_f64
+    logsum_kernel = _kernels_aot.logsum_f64
+    recipsum_kernel = _kernels_aot.recipsum_f64
+else:
+    # 导入时预热JIT，避免首次调用的编译开销
+    moments_kernel(_warmup)
+    logsum_kernel(np.ones(1, dtype=np.float64))
+    recipsum_kernel(np.ones(1, dtype=np.float64))
+
+# 并行内核（batch_summary_kernel、pairwise_slopes_kernel）不支持AOT，也不在导入时预热：
+# 其编译耗时较长，按需在首次调用时编译（cache=True时后续进程直接加载磁盘缓存），
+# 短生命周期的工作进程不为用不到的内核付出启动开销
@@ -5,6 +5,7 @@
 - 均值、总和、计数
 - 最小值、最大值、极差
 - 基础分位数计算
+- 多序列批量统计摘要
 
 设计原则：
 - 使用NumPy向量化操作提升性能
@@ -12,93 +13,230 @@
 - 支持大数据集的内存优化处理
 """
 
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+import hashlib
+import math
+from typing import Dict, List, Any, Optional, Union
 import numpy as np
 from numpy.typing import NDArray
 
+# 延迟导入，处理可能的依赖缺失
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
 
-def mean(data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+from ._kernels import SIMD_ISA, batch_summary_kernel, logsum_kernel, recipsum_kernel
+
+# 支持的输入类型：Python列表、NumPy数组或float64字节缓冲区
+ArrayLike = Union[List[float], NDArray[np.float64], bytes, bytearray, memoryview]
+
+
+def _as_f64(data: ArrayLike) -> NDArray[np.float64]:
+    """将输入转换为连续的float64数组
+
+    - ndarray: 已是连续float64时零拷贝
+    - bytes/bytearray/memoryview: 按float64缓冲区直接映射
+    - 其他序列: 使用fromiter预分配，避免中间Python对象数组
+    """
+    if isinstance(data, np.ndarray):
+        return np.ascontiguousarray(data, dtype=np.float64)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return np.frombuffer(data, dtype=np.float64)
+    return np.fromiter(data, dtype=np.float64, count=len(data))
+
+
+def _fingerprint(data: NDArray) -> int:
+    """计算数组内容的64位指纹（用于结果缓存键）"""
+    buf = np.ascontiguousarray(data, dtype=np.float64).data
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_intdigest(buf)
+    return int.from_bytes(hashlib.blake2b(buf, digest_size=8).digest(), "little")
+
+
+def _to_payload(arr: NDArray, as_list: bool = False) -> Union[NDArray, List]:
+    """数组结果的输出形式
+
+    默认返回连续的NumPy数组，分发器经orjson直接序列化其缓冲区，
+    避免为每个元素创建Python float对象；as_list为True时返回Python列表，
+    供需要原生类型的纯Python调用方使用。
+    """
+    arr = np.ascontiguousarray(arr)
+    return arr.tolist() if as_list else arr
+
+
+# 四分位点
+_QUARTILES = np.array([25.0, 50.0, 75.0])
+
+# mean响应模板，按调用复制而非每次重建
+_MEAN_RESPONSE: Dict[str, Any] = {
+    "result": None,
+    "algorithm": "mean",
+    "method": "arithmetic",
+    "data_size": 0,
+    "implementation": "python_numpy"
+}
+
+
+@lru_cache(maxsize=64)
+def _parse_percentiles(s: str) -> NDArray[np.float64]:
+    """解析逗号分隔的分位数字符串（按字符串缓存，结果只读）"""
+    pcts = np.fromiter((float(p) for p in s.split(",")), dtype=np.float64)
+    pcts.flags.writeable = False
+    return pcts
+
+
+def mean(data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
     """计算算术平均值
     
     Args:
-        data: 数值数据列表
+        data: 数值数据（列表、NumPy数组或float64缓冲区）
         params: 参数字典，支持:
                - method: 'arithmetic'(默认), 'geometric', 'harmonic'
     
     Returns:
         包含计算结果的字典
     """
-    if not data:
+    if len(data) == 0:
         return {"result": None, "error": "Empty data"}
     
-    arr = np.array(data, dtype=np.float64)
-    method = params.get("method", "arithmetic")
+    method = params.get("method", "arithmetic") if params else "arithmetic"
+    arr = _as_f64(data)
+    
+    # 热路径：算术平均直接返回，跳过方法分支
+    if method == "arithmetic":
+        response = _MEAN_RESPONSE.copy()
+        response["result"] = arr.mean().item()
+        response["data_size"] = len(arr)
+        return response
     
     try:
-        if method == "arithmetic":
-            result = float(np.mean(arr))
-        elif method == "geometric":
-            if np.any(arr <= 0):
-                return {"result": None, "error": "Geometric mean requires positive values"}
-            result = float(np.exp(np.mean(np.log(arr))))
+        # 单次遍历累加，非法输入由内核抛出ValueError
+        if method == "geometric":
+            result = math.exp(logsum_kernel(arr) / len(arr))
         elif method == "harmonic":
-            if np.any(arr == 0):
-                return {"result": None, "error": "Harmonic mean undefined for zero values"}
-            result = float(len(arr) / np.sum(1.0 / arr))
+            recip = recipsum_kernel(arr)
+            # 倒数和恰为0（如[1.0, -1.0]）时与NumPy除法一致地返回带符号的inf
+            result = len(arr) / recip if recip != 0 else math.copysign(math.inf, recip)
         else:
             return {"result": None, "error": f"Unknown method: {method}"}
         
-        return {
-            "result": result,
-            "algorithm": "mean",
-            "method": method,
-            "data_size": len(data),
-            "implementation": "python_numpy"
-        }
+        response = _MEAN_RESPONSE.copy()
+        response["result"] = result
+        response["method"] = method
+        response["data_size"] = len(arr)
+        return response
     except Exception as e:
         return {"result": None, "error": str(e)}
 
 
-def basic_summary(data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+def basic_summary(data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
     """计算基础统计摘要
     
     Args:
-        data: 数值数据列表
+        data: 数值数据（列表、NumPy数组或float64缓冲区）
         params: 参数字典
     
     Returns:
         包含多个基础统计量的字典
     """
-    if not data:
+    if len(data) == 0:
         return {"result": None, "error": "Empty data"}
     
     try:
-        arr = np.array(data, dtype=np.float64)
+        arr = _as_f64(data)
+        n = len(arr)
+        
+        # NumPy归约（SIMD实现，NaN按IEEE语义传播）
+        s = arr.sum().item()
+        mn = arr.min().item()
+        mx = arr.max().item()
         
         result = {
-            "count": len(arr),
-            "sum": float(np.sum(arr)),
-            "mean": float(np.mean(arr)),
-            "min": float(np.min(arr)),
-            "max": float(np.max(arr)),
-            "range": float(np.ptp(arr)),  # peak-to-peak (max - min)
+            "count": n,
+            "sum": s,
+            "mean": s / n,
+            "min": mn,
+            "max": mx,
+            "range": mx - mn,  # peak-to-peak (max - min)
         }
         
         return {
             "result": result,
             "algorithm": "basic_summary",
-            "data_size": len(data),
+            "data_size": len(arr),
             "implementation": "python_numpy"
         }
     except Exception as e:
         return {"result": None, "error": str(e)}
 
 
-def percentiles(data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+def batch_basic_summary(data: Any, params: Dict[str, str]) -> Dict[str, Any]:
+    """批量计算多条序列的基础统计摘要
+    
+    一次调用处理整个面板数据，避免逐列的Python往返。
+    
+    Args:
+        data: (n_series, n_points) 的float32/float64数组或嵌套列表；
+              或一维数据/float64缓冲区（需配合n_points参数按行重排）
+        params: 参数字典，支持:
+               - n_points: 每条序列的长度（一维输入时必需）
+    
+    Returns:
+        包含逐序列统计量列表的字典
+    """
+    try:
+        if not isinstance(data, (np.ndarray, bytes, bytearray, memoryview)):
+            # 嵌套列表等序列：fromiter无法处理二维输入，先整体转换
+            data = np.asarray(data, dtype=np.float64)
+        if isinstance(data, np.ndarray) and data.ndim == 2:
+            if data.dtype in (np.float32, np.float64):
+                arr = np.ascontiguousarray(data)
+            else:
+                arr = np.ascontiguousarray(data, dtype=np.float64)
+        else:
+            flat = _as_f64(data)
+            if "n_points" not in params:
+                return {"result": None, "error": "1-D input requires 'n_points' parameter"}
+            arr = flat.reshape(-1, int(params["n_points"]))
+        
+        n_series, n_points = arr.shape
+        if n_series == 0 or n_points == 0:
+            return {"result": None, "error": "Empty data"}
+        
+        out = batch_summary_kernel(arr)
+        s, mn, mx, m2 = out[:, 0], out[:, 1], out[:, 2], out[:, 3]
+        variance = m2 / (n_points - 1) if n_points > 1 else np.full(n_series, np.nan)
+        
+        result = {
+            "count": n_points,
+            "sum": s.tolist(),
+            "mean": (s / n_points).tolist(),
+            "min": mn.tolist(),
+            "max": mx.tolist(),
+            "range": (mx - mn).tolist(),
+            "variance": variance.tolist(),
+            "std_dev": np.sqrt(variance).tolist(),
+        }
+        
+        return {
+            "result": result,
+            "algorithm": "batch_basic_summary",
+            "n_series": n_series,
+            "data_size": arr.size,
+            "simd_isa": SIMD_ISA,
+            "implementation": "python_numba"
+        }
+    except Exception as e:
+        return {"result": None, "error": str(e)}
+
+
+def percentiles(data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
     """计算分位数
     
     Args:
-        data: 数值数据列表
+        data: 数值数据（列表、NumPy数组或float64缓冲区）
         params: 参数字典，支持:
                - percentiles: 逗号分隔的分位数字符串，如 "25,50,75,90,95,99"
                - method: numpy分位数插值方法
@@ -106,129 +244,128 @@ def percentiles(data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
     Returns:
         包含分位数结果的字典
     """
-    if not data:
+    if len(data) == 0:
         return {"result": None, "error": "Empty data"}
     
     try:
-        arr = np.array(data, dtype=np.float64)
+        arr = _as_f64(data)
         
         # 解析分位数参数
-        percentiles_str = params.get("percentiles", "25,50,75,90,95,99")
-        percentiles_list = [float(p) for p in percentiles_str.split(",")]
+        pcts = _parse_percentiles(params.get("percentiles", "25,50,75,90,95,99"))
         
         # 验证分位数范围
-        if any(p < 0 or p > 100 for p in percentiles_list):
+        if (pcts < 0).any() or (pcts > 100).any():
             return {"result": None, "error": "Percentiles must be between 0 and 100"}
         
         method = params.get("method", "linear")
         
         # 计算分位数
-        percentile_values = np.percentile(arr, percentiles_list, method=method)
+        percentile_values = np.asarray(np.percentile(arr, pcts, method=method), dtype=np.float64)
         
         # 构建结果字典
         result = {}
-        for p, value in zip(percentiles_list, percentile_values):
+        for p, value in zip(pcts.tolist(), percentile_values.tolist()):
             key = f"p{int(p)}" if p == int(p) else f"p{p}"
-            result[key] = float(value)
+            result[key] = value
         
         return {
             "result": result,
             "algorithm": "percentiles",
             "method": method,
-            "data_size": len(data),
+            "data_size": len(arr),
             "implementation": "python_numpy"
         }
     except Exception as e:
         return {"result": None, "error": str(e)}
 
 
-def quantiles(data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+def quantiles(data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
     """计算四分位数
     
     Args:
-        data: 数值数据列表
+        data: 数值数据（列表、NumPy数组或float64缓冲区）
         params: 参数字典
     
     Returns:
         包含四分位数的字典
     """
-    if not data:
+    if len(data) == 0:
         return {"result": None, "error": "Empty data"}
     
     try:
-        arr = np.array(data, dtype=np.float64)
+        arr = _as_f64(data)
         
-        q1, q2, q3 = np.percentile(arr, [25, 50, 75])
+        q1, q2, q3 = np.percentile(arr, _QUARTILES).tolist()
         iqr = q3 - q1
         
         result = {
-            "q1": float(q1),      # 第一四分位数
-            "q2": float(q2),      # 第二四分位数(中位数)
-            "q3": float(q3),      # 第三四分位数
-            "iqr": float(iqr),    # 四分位距
+            "q1": q1,      # 第一四分位数
+            "q2": q2,      # 第二四分位数(中位数)
+            "q3": q3,      # 第三四分位数
+            "iqr": iqr,    # 四分位距
         }
         
         return {
             "result": result,
             "algorithm": "quantiles",
-            "data_size": len(data),
+            "data_size": len(arr),
             "implementation": "python_numpy"
         }
     except Exception as e:
         return {"result": None, "error": str(e)}
 
 
-def count_and_sum(data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+def count_and_sum(data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
     """计算计数和总和
     
     高效的计数和求和运算，支持大数据集
     
     Args:
-        data: 数值数据列表
+        data: 数值数据（列表、NumPy数组或float64缓冲区）
         params: 参数字典
     
     Returns:
         包含计数和总和的字典
     """
-    if not data:
+    if len(data) == 0:
         return {"result": {"count": 0, "sum": 0.0}, "algorithm": "count_and_sum"}
     
     try:
-        arr = np.array(data, dtype=np.float64)
+        arr = _as_f64(data)
         
         result = {
             "count": len(arr),
-            "sum": float(np.sum(arr)),
+            "sum": arr.sum().item(),
         }
         
         return {
             "result": result,
             "algorithm": "count_and_sum",
-            "data_size": len(data),
+            "data_size": len(arr),
             "implementation": "python_numpy"
         }
     except Exception as e:
         return {"result": None, "error": str(e)}
 
 
-def min_max(data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+def min_max(data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
     """计算最小值和最大值
     
     Args:
-        data: 数值数据列表
+        data: 数值数据（列表、NumPy数组或float64缓冲区）
         params: 参数字典
     
     Returns:
         包含最小值、最大值和极差的字典
     """
-    if not data:
+    if len(data) == 0:
         return {"result": None, "error": "Empty data"}
     
     try:
-        arr = np.array(data, dtype=np.float64)
+        arr = _as_f64(data)
         
-        min_val = float(np.min(arr))
-        max_val = float(np.max(arr))
+        min_val = arr.min().item()
+        max_val = arr.max().item()
         range_val = max_val - min_val
         
         result = {
@@ -240,7 +377,7 @@ def min_max(data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
         return {
             "result": result,
             "algorithm": "min_max",
-            "data_size": len(data),
+            "data_size": len(arr),
             "implementation": "python_numpy"
         }
     except Exception as e:
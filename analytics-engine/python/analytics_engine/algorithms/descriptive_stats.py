@@ -11,23 +11,39 @@
 - 使用SciPy统计函数提供精确计算
 - 处理各种分布形状和异常值
 - 提供详细的统计诊断信息
+- 单次遍历计算各阶矩，组合分析时共享同一数组与矩统计
 """
 
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterator, Any, Optional, Tuple
+from collections import OrderedDict
+from contextlib import contextmanager
+import math
+import threading
 import numpy as np
 from scipy import stats
-from collections import Counter
 import warnings
 
-# 忽略可能的数值警告
-warnings.filterwarnings('ignore', category=RuntimeWarning)
+from ._kernels import moments_kernel
+from .basic_stats import ArrayLike, _as_f64, _fingerprint
 
+# bincount快速路径允许的最大整数取值跨度
+_BINCOUNT_MAX_SPAN = 10_000_000
 
-def variance_and_std(data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+# 正态性检验结果缓存：(长度, 数据指纹) -> 检验结果，LRU淘汰
+_NORMALITY_CACHE: "OrderedDict[Tuple[int, int], Dict[str, Any]]" = OrderedDict()
+_NORMALITY_CACHE_SIZE = 256
+_NORMALITY_LOCK = threading.Lock()
+
+# Shapiro-Wilk抽样检验：样本量与固定随机种子
+_SHAPIRO_SAMPLE_SIZE = 500
+_SHAPIRO_SEED = 0x5A17
+
+
+def variance_and_std(data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
     """计算方差和标准差
     
     Args:
-        data: 数值数据列表
+        data: 数值数据（列表、NumPy数组或float64缓冲区）
         params: 参数字典，支持:
                - ddof: 自由度修正，0为总体，1为样本(默认)
                - method: 'biased' 或 'unbiased'(默认)
@@ -35,14 +51,120 @@ def variance_and_std(data: List[float], params: Dict[str, str]) -> Dict[str, Any
     Returns:
         包含方差和标准差的字典
     """
-    if not data:
+    if len(data) == 0:
+        return {"result": None, "error": "Empty data"}
+    
+    return _variance_and_std_impl(_as_f64(data), params)
+
+
+def skewness_and_kurtosis(data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
+    """计算偏度和峰度
+    
+    Args:
+        data: 数值数据（列表、NumPy数组或float64缓冲区）
+        params: 参数字典，支持:
+               - method: 'fisher'(默认) 或 'pearson'
+               - bias: 是否使用有偏估计
+    
+    Returns:
+        包含偏度和峰度的字典
+    """
+    if len(data) == 0:
+        return {"result": None, "error": "Empty data"}
+    
+    return _skewness_and_kurtosis_impl(_as_f64(data), params)
+
+
+def mode_analysis(data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
+    """计算众数分析
+    
+    Args:
+        data: 数值数据（列表、NumPy数组或float64缓冲区）
+        params: 参数字典，支持:
+               - tolerance: 浮点数容差，用于分组相近的值
+               - max_modes: 最大众数个数
+    
+    Returns:
+        包含众数分析的字典
+    """
+    if len(data) == 0:
+        return {"result": None, "error": "Empty data"}
+    
+    return _mode_analysis_impl(_as_f64(data), params)
+
+
+def distribution_analysis(data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
+    """综合分布形状分析
+    
+    Args:
+        data: 数值数据（列表、NumPy数组或float64缓冲区）
+        params: 参数字典
+    
+    Returns:
+        包含分布形状分析的字典
+    """
+    if len(data) == 0:
+        return {"result": None, "error": "Empty data"}
+    
+    return _distribution_analysis_impl(_as_f64(data), params)
+
+
+def comprehensive_stats(data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
+    """综合描述性统计分析
+    
+    整合所有描述性统计量，提供完整的数据描述。
+    数组只转换一次，各阶矩与中位数只计算一次并在子分析间共享。
+    矩统计预先算好后，余下的子分析主要是持有GIL的Python/SciPy代码，
+    且_silence使用的warnings.catch_warnings并非线程安全，故顺序执行。
+    
+    Args:
+        data: 数值数据（列表、NumPy数组或float64缓冲区）
+        params: 参数字典
+    
+    Returns:
+        包含所有描述性统计量的字典
+    """
+    if len(data) == 0:
         return {"result": None, "error": "Empty data"}
     
-    if len(data) < 2:
+    try:
+        arr = _as_f64(data)
+        moments = _compute_moments(arr, with_median=True)
+        
+        # 执行各个子分析，共享数组与矩统计
+        variance_result = _variance_and_std_impl(arr, params, moments)
+        skew_kurt_result = _skewness_and_kurtosis_impl(arr, params, moments)
+        mode_result = _mode_analysis_impl(arr, params)
+        distribution_result = _distribution_analysis_impl(arr, params, moments)
+        
+        # 整合结果
+        result = {
+            "variance_analysis": variance_result.get("result"),
+            "shape_analysis": skew_kurt_result.get("result"),
+            "mode_analysis": mode_result.get("result"),
+            "distribution_analysis": distribution_result.get("result"),
+        }
+        
+        return {
+            "result": result,
+            "algorithm": "comprehensive_stats",
+            "data_size": len(arr),
+            "implementation": "python_composite"
+        }
+    except Exception as e:
+        return {"result": None, "error": str(e)}
+
+
+# 内部实现：接收已转换的数组与可选的预计算矩统计
+def _variance_and_std_impl(arr: np.ndarray, params: Dict[str, str],
+                           moments: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """方差和标准差的内部实现"""
+    if len(arr) < 2:
         return {"result": None, "error": "Need at least 2 data points"}
     
     try:
-        arr = np.array(data, dtype=np.float64)
+        if moments is None:
+            moments = _compute_moments(arr)
         
         # 自由度修正
         ddof = int(params.get("ddof", "1"))
@@ -53,13 +175,14 @@ def variance_and_std(data: List[float], params: Dict[str, str]) -> Dict[str, Any
         elif method == "biased":
             ddof = 0
         
-        variance = float(np.var(arr, ddof=ddof))
-        std_dev = float(np.std(arr, ddof=ddof))
+        variance = moments["m2"] / (moments["n"] - ddof)
+        std_dev = math.sqrt(variance)
+        mean_val = moments["mean"]
         
         result = {
             "variance": variance,
             "std_dev": std_dev,
-            "coefficient_of_variation": std_dev / np.mean(arr) if np.mean(arr) != 0 else None,
+            "coefficient_of_variation": std_dev / mean_val if mean_val != 0 else None,
         }
         
         return {
@@ -67,48 +190,37 @@ def variance_and_std(data: List[float], params: Dict[str, str]) -> Dict[str, Any
             "algorithm": "variance_and_std",
             "method": method,
             "ddof": ddof,
-            "data_size": len(data),
+            "data_size": len(arr),
             "implementation": "python_numpy"
         }
     except Exception as e:
         return {"result": None, "error": str(e)}
 
 
-def skewness_and_kurtosis(data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
-    """计算偏度和峰度
-    
-    Args:
-        data: 数值数据列表
-        params: 参数字典，支持:
-               - method: 'fisher'(默认) 或 'pearson'
-               - bias: 是否使用有偏估计
-    
-    Returns:
-        包含偏度和峰度的字典
-    """
-    if not data:
-        return {"result": None, "error": "Empty data"}
-    
-    if len(data) < 3:
+def _skewness_and_kurtosis_impl(arr: np.ndarray, params: Dict[str, str],
+                                moments: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """偏度和峰度的内部实现"""
+    if len(arr) < 3:
         return {"result": None, "error": "Need at least 3 data points for skewness"}
     
     try:
-        arr = np.array(data, dtype=np.float64)
+        if moments is None:
+            moments = _compute_moments(arr)
         
         # 参数设置
         bias = params.get("bias", "false").lower() == "true"
         method = params.get("method", "fisher")
         
-        # 计算偏度和峰度
-        skewness = float(stats.skew(arr, bias=bias))
+        # 计算偏度和峰度（与scipy.stats.skew/kurtosis的定义一致）
+        skewness = _skew_from_moments(moments, bias)
         
-        if len(data) >= 4:
+        if len(arr) >= 4:
             if method == "fisher":
                 # Fisher定义：正态分布的峰度为0
-                kurtosis = float(stats.kurtosis(arr, bias=bias, fisher=True))
+                kurtosis = _kurtosis_from_moments(moments, bias, fisher=True)
             else:
                 # Pearson定义：正态分布的峰度为3
-                kurtosis = float(stats.kurtosis(arr, bias=bias, fisher=False))
+                kurtosis = _kurtosis_from_moments(moments, bias, fisher=False)
         else:
             kurtosis = None
         
@@ -128,105 +240,120 @@ def skewness_and_kurtosis(data: List[float], params: Dict[str, str]) -> Dict[str
             "algorithm": "skewness_and_kurtosis",
             "method": method,
             "bias": bias,
-            "data_size": len(data),
-            "implementation": "python_scipy"
+            "data_size": len(arr),
+            "implementation": "python_numba"
         }
     except Exception as e:
         return {"result": None, "error": str(e)}
 
 
-def mode_analysis(data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
-    """计算众数分析
-    
-    Args:
-        data: 数值数据列表
-        params: 参数字典，支持:
-               - tolerance: 浮点数容差，用于分组相近的值
-               - max_modes: 最大众数个数
-    
-    Returns:
-        包含众数分析的字典
-    """
-    if not data:
-        return {"result": None, "error": "Empty data"}
-    
+def _mode_analysis_impl(arr: np.ndarray, params: Dict[str, str]) -> Dict[str, Any]:
+    """众数分析的内部实现"""
     try:
-        arr = np.array(data, dtype=np.float64)
         tolerance = float(params.get("tolerance", "1e-10"))
         max_modes = int(params.get("max_modes", "5"))
         
+        # NaN不参与众数计数（np.unique会将多个NaN合并为一个值）
+        valid = arr[~np.isnan(arr)]
+        
         # 对于连续数据，需要考虑容差
+        bincount_result = None
         if tolerance > 0:
             # 四舍五入到指定精度
             decimal_places = max(0, -int(np.log10(tolerance)))
-            rounded_data = np.round(arr, decimal_places)
-            counter = Counter(rounded_data)
+            rounded_data = np.round(valid, decimal_places)
+            # 取值范围有限的量化数据走整数计数快速路径
+            if rounded_data.size > 0:
+                bincount_result = _bincount_modes(rounded_data, decimal_places, max_modes)
         else:
-            counter = Counter(arr)
-        
-        # 找出出现频率最高的值
-        if not counter:
-            return {"result": None, "error": "No valid data for mode calculation"}
+            rounded_data = valid
         
-        max_count = counter.most_common(1)[0][1]
-        modes = [value for value, count in counter.items() if count == max_count]
-        
-        # 限制返回的众数个数
-        if len(modes) > max_modes:
-            modes = modes[:max_modes]
+        if bincount_result is not None:
+            modes, max_count = bincount_result
+        else:
+            # 向量化计数，避免Counter逐元素哈希
+            vals, counts = np.unique(rounded_data, return_counts=True)
+            
+            # 找出出现频率最高的值
+            if vals.size == 0:
+                return {"result": None, "error": "No valid data for mode calculation"}
+            
+            max_count = counts.max()
+            
+            # 限制返回的众数个数
+            modes = vals[counts == max_count][:max_modes]
         
         # 计算众数统计
-        mode_frequency = max_count
-        mode_percentage = (mode_frequency / len(data)) * 100
+        mode_frequency = int(max_count)
+        mode_percentage = (mode_frequency / len(arr)) * 100
         is_multimodal = len(modes) > 1
         
         result = {
-            "modes": [float(mode) for mode in modes],
+            "modes": modes.tolist(),
             "mode_count": len(modes),
             "mode_frequency": mode_frequency,
             "mode_percentage": mode_percentage,
             "is_multimodal": is_multimodal,
-            "distribution_type": _classify_distribution_by_modes(len(modes))
+            "distribution_type": _classify_distribution_by_modes(len(modes)),
         }
         
         return {
             "result": result,
             "algorithm": "mode_analysis",
             "tolerance": tolerance,
-            "data_size": len(data),
-            "implementation": "python_collections"
+            "data_size": len(arr),
+            "implementation": "python_numpy"
         }
     except Exception as e:
         return {"result": None, "error": str(e)}
 
 
-def distribution_analysis(data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
-    """综合分布形状分析
+def _bincount_modes(rounded: np.ndarray, decimal_places: int,
+                    max_modes: int) -> Optional[Tuple[np.ndarray, int]]:
+    """整数化后取值范围有限时，用np.bincount计数求众数
     
-    Args:
-        data: 数值数据列表
-        params: 参数字典
-    
-    Returns:
-        包含分布形状分析的字典
+    数据本身为整数时直接按整数计数，否则按10**decimal_places缩放。
+    取值跨度超过上限（或含Inf）时返回None，由调用方回退到np.unique。
     """
-    if not data:
-        return {"result": None, "error": "Empty data"}
+    n = len(rounded)
+    lo, hi = rounded.min().item(), rounded.max().item()
+    if not np.isfinite(hi - lo):
+        return None
     
-    if len(data) < 3:
+    max_span = min(_BINCOUNT_MAX_SPAN, 4 * n)
+    if hi - lo < max_span and np.array_equal(rounded, np.rint(rounded)):
+        scale = 1.0
+    else:
+        scale = 10.0 ** decimal_places
+        if (hi - lo) * scale >= max_span:
+            return None
+    
+    scaled = np.rint(rounded * scale).astype(np.int64)
+    offset = scaled.min()
+    counts = np.bincount(scaled - offset)
+    max_count = counts.max()
+    mode_idx = np.flatnonzero(counts == max_count)[:max_modes]
+    return (mode_idx + offset) / scale, int(max_count)
+
+
+def _distribution_analysis_impl(arr: np.ndarray, params: Dict[str, str],
+                                moments: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """分布形状分析的内部实现"""
+    if len(arr) < 3:
         return {"result": None, "error": "Need at least 3 data points"}
     
     try:
-        arr = np.array(data, dtype=np.float64)
+        if moments is None:
+            moments = _compute_moments(arr, with_median=True)
         
         # 基础统计
-        mean_val = float(np.mean(arr))
-        median_val = float(np.median(arr))
-        std_val = float(np.std(arr, ddof=1))
+        n = moments["n"]
+        mean_val = moments["mean"]
+        median_val = moments["median"]
         
-        # 偏度和峰度
-        skewness = float(stats.skew(arr))
-        kurtosis = float(stats.kurtosis(arr, fisher=True)) if len(arr) >= 4 else None
+        # 偏度和峰度（有偏估计，与scipy默认一致）
+        skewness = _skew_from_moments(moments, bias=True)
+        kurtosis = _kurtosis_from_moments(moments, bias=True, fisher=True) if n >= 4 else None
         
         # 分布类型判断
         distribution_shape = _analyze_distribution_shape(mean_val, median_val, skewness, kurtosis)
@@ -244,51 +371,65 @@ def distribution_analysis(data: List[float], params: Dict[str, str]) -> Dict[str
         return {
             "result": result,
             "algorithm": "distribution_analysis",
-            "data_size": len(data),
+            "data_size": len(arr),
             "implementation": "python_scipy"
         }
     except Exception as e:
         return {"result": None, "error": str(e)}
 
 
-def comprehensive_stats(data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
-    """综合描述性统计分析
-    
-    整合所有描述性统计量，提供完整的数据描述
-    
-    Args:
-        data: 数值数据列表
-        params: 参数字典
+def _compute_moments(arr: np.ndarray, with_median: bool = False) -> Dict[str, float]:
+    """单次遍历计算均值与二至四阶中心矩
     
     Returns:
-        包含所有描述性统计量的字典
+        字典，m2/m3/m4为离差幂和（未除以n）；with_median时附带中位数
     """
-    if not data:
-        return {"result": None, "error": "Empty data"}
-    
-    try:
-        # 调用各个子函数
-        variance_result = variance_and_std(data, params)
-        skew_kurt_result = skewness_and_kurtosis(data, params)
-        mode_result = mode_analysis(data, params)
-        distribution_result = distribution_analysis(data, params)
-        
-        # 整合结果
-        result = {
-            "variance_analysis": variance_result.get("result"),
-            "shape_analysis": skew_kurt_result.get("result"),
-            "mode_analysis": mode_result.get("result"),
-            "distribution_analysis": distribution_result.get("result"),
-        }
-        
-        return {
-            "result": result,
-            "algorithm": "comprehensive_stats",
-            "data_size": len(data),
-            "implementation": "python_composite"
-        }
-    except Exception as e:
-        return {"result": None, "error": str(e)}
+    # 内核直接返回Python标量，无需逐个转换
+    n, mean_val, m2, m3, m4, min_val, max_val = moments_kernel(arr)
+    moments = {
+        "n": n,
+        "mean": mean_val,
+        "m2": m2,
+        "m3": m3,
+        "m4": m4,
+        "min": min_val,
+        "max": max_val,
+    }
+    if with_median:
+        moments["median"] = float(np.median(arr))
+    return moments
+
+
+def _is_degenerate(moments: Dict[str, float]) -> bool:
+    """方差相对均值可忽略时（常数数据），高阶标准化矩无定义"""
+    m2 = moments["m2"] / moments["n"]
+    return m2 <= (np.finfo(np.float64).resolution * moments["mean"]) ** 2
+
+
+def _skew_from_moments(moments: Dict[str, float], bias: bool) -> float:
+    """由中心矩计算偏度，语义与scipy.stats.skew一致"""
+    if _is_degenerate(moments):
+        return float("nan")
+    n = moments["n"]
+    m2 = moments["m2"] / n
+    m3 = moments["m3"] / n
+    g1 = m3 / m2 ** 1.5
+    if not bias and n > 2:
+        g1 = math.sqrt((n - 1.0) * n) / (n - 2.0) * g1
+    return g1
+
+
+def _kurtosis_from_moments(moments: Dict[str, float], bias: bool, fisher: bool) -> float:
+    """由中心矩计算峰度，语义与scipy.stats.kurtosis一致"""
+    if _is_degenerate(moments):
+        return float("nan")
+    n = moments["n"]
+    m2 = moments["m2"] / n
+    m4 = moments["m4"] / n
+    g2 = m4 / m2 ** 2
+    if not bias and n > 3:
+        g2 = 1.0 / (n - 2) / (n - 3) * ((n ** 2 - 1.0) * g2 - 3 * (n - 1) ** 2.0) + 3.0
+    return g2 - 3.0 if fisher else g2
 
 
 # 辅助函数
@@ -365,29 +506,68 @@ def _analyze_tail_behavior(kurtosis: float) -> Dict[str, Any]:
     }
 
 
+@contextmanager
+def _silence() -> Iterator[None]:
+    """仅在SciPy调用范围内屏蔽数值警告，不修改进程级警告过滤器"""
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        yield
+
+
 def _test_normality(data: np.ndarray) -> Dict[str, Any]:
-    """简单的正态性检验"""
+    """简单的正态性检验（按数据指纹缓存结果）"""
+    if len(data) < 8:
+        return {"test": "insufficient_data", "p_value": None, "is_normal": None}
+    
+    key = (len(data), _fingerprint(data))
+    with _NORMALITY_LOCK:
+        cached = _NORMALITY_CACHE.get(key)
+        if cached is not None:
+            _NORMALITY_CACHE.move_to_end(key)
+            return dict(cached)
+    
+    result = _run_normality_test(data)
+    with _NORMALITY_LOCK:
+        _NORMALITY_CACHE[key] = result
+        if len(_NORMALITY_CACHE) > _NORMALITY_CACHE_SIZE:
+            _NORMALITY_CACHE.popitem(last=False)
+    return dict(result)
+
+
+def _run_normality_test(data: np.ndarray) -> Dict[str, Any]:
+    """执行正态性检验"""
     try:
-        if len(data) < 8:
-            return {"test": "insufficient_data", "p_value": None, "is_normal": None}
+        n = len(data)
+        n_sampled = n
         
         # Shapiro-Wilk检验 (适用于小样本)
-        if len(data) <= 5000:
-            statistic, p_value = stats.shapiro(data)
+        if n <= _SHAPIRO_SAMPLE_SIZE:
+            with _silence():
+                statistic, p_value = stats.shapiro(data)
             test_name = "shapiro_wilk"
+        elif n <= 5000:
+            # 中等样本：固定种子无放回抽样后检验，结果可复现
+            rng = np.random.default_rng(_SHAPIRO_SEED)
+            sample = data[rng.choice(n, _SHAPIRO_SAMPLE_SIZE, replace=False)]
+            with _silence():
+                statistic, p_value = stats.shapiro(sample)
+            test_name = "shapiro_wilk_sampled"
+            n_sampled = _SHAPIRO_SAMPLE_SIZE
         else:
             # D'Agostino检验 (适用于大样本)
-            statistic, p_value = stats.normaltest(data)
+            with _silence():
+                statistic, p_value = stats.normaltest(data)
             test_name = "dagostino"
         
-        is_normal = p_value > 0.05  # 95%置信度
+        is_normal = bool(p_value > 0.05)  # 95%置信度
         
         return {
             "test": test_name,
             "statistic": float(statistic),
             "p_value": float(p_value),
             "is_normal": is_normal,
-            "confidence_level": 0.95
+            "confidence_level": 0.95,
+            "n_sampled": n_sampled
         }
     except Exception:
-        return {"test": "failed", "p_value": None, "is_normal": None} 
\ No newline at end of file
+        return {"test": "failed", "p_value": None, "is_normal": None}
@@ -5,15 +5,18 @@ Contains Python implementations of advanced ML algorithms that are
 difficult to implement efficiently in Rust or require specialized libraries.
 """
 
+from collections import OrderedDict
+import functools
+import threading
 import numpy as np
-from typing import Dict, List, Any, Union
+from typing import Callable, Dict, Any, Tuple
 import warnings
 
+from .basic_stats import ArrayLike, _as_f64, _fingerprint, _to_payload
+
 # 延迟导入，处理可能的依赖缺失
 try:
     from sklearn.cluster import KMeans, DBSCAN
-    from sklearn.decomposition import PCA
-    from sklearn.linear_model import LinearRegression
     from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
     from sklearn.preprocessing import StandardScaler
     from sklearn.metrics import mean_squared_error, r2_score
@@ -22,6 +25,51 @@ except ImportError:
     SKLEARN_AVAILABLE = False
     warnings.warn("scikit-learn not available, ML algorithms will be limited")
 
+# 轮廓系数为O(n²)距离计算，超过该样本量时随机抽样估计
+_SILHOUETTE_SAMPLE_SIZE = 2000
+
+# 模型拟合结果缓存：(方法名, 长度, 数据指纹, 参数) -> 结果，LRU淘汰
+# 所有估计器均以固定random_state拟合，相同输入与参数的结果确定
+_FIT_CACHE: "OrderedDict[Tuple[str, int, int, frozenset], Dict[str, Any]]" = OrderedDict()
+_FIT_CACHE_SIZE = 32
+_FIT_LOCK = threading.Lock()
+
+
+def _memoize_fit(method: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """按数据指纹与参数缓存模型拟合结果，重复查询无需重新训练
+
+    指纹为数据缓冲区的64位哈希，避免对大元组求哈希。
+    缓存只保存只读的NumPy数组结果；as_list不参与缓存键，
+    在取出结果后才转换为列表，调用方每次得到新的列表对象。
+    """
+    @functools.wraps(method)
+    def wrapper(self, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
+        arr = _as_f64(data)
+        as_list = params.get("as_list", "false").lower() == "true"
+        fit_params = {k: v for k, v in params.items() if k != "as_list"}
+        key = (method.__name__, len(arr), _fingerprint(arr), frozenset(fit_params.items()))
+        with _FIT_LOCK:
+            result = _FIT_CACHE.get(key)
+            if result is not None:
+                _FIT_CACHE.move_to_end(key)
+        
+        if result is None:
+            result = method(self, arr, fit_params)
+            for value in result.values():
+                if isinstance(value, np.ndarray):
+                    value.flags.writeable = False
+            with _FIT_LOCK:
+                _FIT_CACHE[key] = result
+                if len(_FIT_CACHE) > _FIT_CACHE_SIZE:
+                    _FIT_CACHE.popitem(last=False)
+        
+        return {
+            name: _to_payload(value, as_list) if isinstance(value, np.ndarray) else value
+            for name, value in result.items()
+        }
+    return wrapper
+
+
 class AdvancedMLAlgorithms:
     """高级机器学习算法实现"""
     
@@ -36,34 +84,40 @@ class AdvancedMLAlgorithms:
         if not self.available:
             raise RuntimeError("scikit-learn not available for ML algorithms")
     
-    def kmeans_clustering(self, data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+    @_memoize_fit
+    def kmeans_clustering(self, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
         """K-means聚类分析"""
         self._check_availability()
         
         # 转换数据为2D数组（假设data是1D，转为列向量）
-        X = np.array(data).reshape(-1, 1)
+        X = _as_f64(data).reshape(-1, 1)
         
         # 获取参数
         k = int(params.get("k", "3"))
         max_iter = int(params.get("max_iter", "300"))
         random_state = int(params.get("random_state", "42"))
         
-        # 执行K-means
-        kmeans = KMeans(n_clusters=k, max_iter=max_iter, random_state=random_state, n_init=10)
+        # 执行K-means（k-means++初始化只需一次运行；Elkan算法利用三角不等式减少距离计算）
+        kmeans = KMeans(n_clusters=k, max_iter=max_iter, random_state=random_state,
+                        n_init="auto", algorithm="elkan")
         labels = kmeans.fit_predict(X)
-        centers = kmeans.cluster_centers_.flatten().tolist()
+        centers = kmeans.cluster_centers_.ravel()
         
         # 计算轮廓系数（如果数据足够）
         silhouette_score = 0.0
-        if len(set(labels)) > 1 and len(data) > k:
+        if len(set(labels)) > 1 and len(X) > k:
             try:
                 from sklearn.metrics import silhouette_score as sklearn_silhouette_score
-                silhouette_score = float(sklearn_silhouette_score(X, labels))
+                silhouette_score = float(sklearn_silhouette_score(
+                    X, labels,
+                    sample_size=min(_SILHOUETTE_SAMPLE_SIZE, len(X)),
+                    random_state=random_state
+                ))
             except ImportError:
                 pass
         
         return {
-            "clusters": labels.tolist(),
+            "clusters": labels,
             "centers": centers,
             "n_clusters": k,
             "inertia": float(kmeans.inertia_),
@@ -71,11 +125,12 @@ class AdvancedMLAlgorithms:
             "n_iter": int(kmeans.n_iter_)
         }
     
-    def dbscan_clustering(self, data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+    @_memoize_fit
+    def dbscan_clustering(self, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
         """DBSCAN聚类分析"""
         self._check_availability()
         
-        X = np.array(data).reshape(-1, 1)
+        X = _as_f64(data).reshape(-1, 1)
         
         # 获取参数
         eps = float(params.get("eps", "0.5"))
@@ -85,25 +140,28 @@ class AdvancedMLAlgorithms:
         dbscan = DBSCAN(eps=eps, min_samples=min_samples)
         labels = dbscan.fit_predict(X)
         
-        # 分析结果
-        n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
-        n_noise = list(labels).count(-1)
+        # 分析结果：一次np.unique同时得到簇标签与各标签计数，噪声点标签为-1
+        unique_labels, counts = np.unique(labels, return_counts=True)
+        noise_mask = unique_labels == -1
+        n_noise = int(counts[noise_mask].sum())
+        n_clusters = int(len(unique_labels) - noise_mask.sum())
         
         return {
-            "clusters": labels.tolist(),
+            "clusters": labels,
             "n_clusters": n_clusters,
             "n_noise_points": n_noise,
             "eps": eps,
             "min_samples": min_samples,
-            "core_samples": dbscan.core_sample_indices_.tolist()
+            "core_samples": dbscan.core_sample_indices_
         }
     
-    def pca_analysis(self, data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+    def pca_analysis(self, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
         """主成分分析"""
         self._check_availability()
         
         # 对于1D数据，我们创建一个简单的多维数据用于演示
         # 实际使用中应该传入多维数据
+        data = _as_f64(data)
         if len(data) < 2:
             raise ValueError("PCA requires at least 2 data points")
         
@@ -116,69 +174,99 @@ class AdvancedMLAlgorithms:
             n_components = int(n_components)
         else:
             n_components = min(2, X.shape[1])
+        as_list = params.get("as_list", "false").lower() == "true"
         
         # 标准化数据
         scaler = StandardScaler()
         X_scaled = scaler.fit_transform(X)
         
-        # 执行PCA
-        pca = PCA(n_components=n_components)
-        X_pca = pca.fit_transform(X_scaled)
+        if not 1 <= n_components <= X.shape[1]:
+            raise ValueError(f"n_components must be between 1 and {X.shape[1]}")
+        
+        # 执行PCA：n_samples >> n_features，对称协方差矩阵特征分解代替数据矩阵的完整SVD
+        # X_scaled已中心化，C = X^T X / (n-1)
+        cov = (X_scaled.T @ X_scaled) / (X_scaled.shape[0] - 1)
+        evals, evecs = np.linalg.eigh(cov)
+        
+        # eigh按特征值升序返回，反转为降序；舍入误差可能产生极小的负特征值
+        evals = np.clip(evals[::-1], 0.0, None)
+        components = evecs[:, ::-1].T[:n_components]
+        # 符号约定：每个主成分绝对值最大的载荷取正，保证结果确定
+        signs = np.sign(components[np.arange(n_components), np.argmax(np.abs(components), axis=1)])
+        components *= np.where(signs == 0, 1.0, signs)[:, None]
+        
+        X_pca = X_scaled @ components.T
+        explained_variance = evals[:n_components]
+        total_var = evals.sum()
+        explained_variance_ratio = explained_variance / total_var if total_var > 0 else np.zeros(n_components)
         
         return {
-            "transformed_data": X_pca.tolist(),
-            "explained_variance_ratio": pca.explained_variance_ratio_.tolist(),
-            "explained_variance": pca.explained_variance_.tolist(),
-            "components": pca.components_.tolist(),
+            "transformed_data": _to_payload(X_pca, as_list),
+            "explained_variance_ratio": _to_payload(explained_variance_ratio, as_list),
+            "explained_variance": _to_payload(explained_variance, as_list),
+            "components": _to_payload(components, as_list),
             "n_components": n_components,
-            "total_variance_explained": float(sum(pca.explained_variance_ratio_))
+            "total_variance_explained": float(explained_variance_ratio.sum())
         }
     
-    def linear_regression(self, data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
-        """线性回归分析"""
-        self._check_availability()
-        
-        if len(data) < 2:
+    def linear_regression(self, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
+        """线性回归分析（单特征闭式解，无需sklearn）"""
+        y = _as_f64(data)
+        if len(y) < 2:
             raise ValueError("Linear regression requires at least 2 data points")
         
-        # 创建特征矩阵（时间序列索引作为X）
-        X = np.arange(len(data)).reshape(-1, 1)
-        y = np.array(data)
+        # 时间序列索引作为唯一特征
+        x = np.arange(len(y), dtype=np.float64)
         
         # 获取参数
         fit_intercept = params.get("fit_intercept", "true").lower() == "true"
+        as_list = params.get("as_list", "false").lower() == "true"
         
-        # 执行线性回归
-        model = LinearRegression(fit_intercept=fit_intercept)
-        model.fit(X, y)
+        # 最小二乘闭式解
+        ym = y.mean()
+        if fit_intercept:
+            xm = x.mean()
+            dx = x - xm
+            slope = (dx @ (y - ym)) / (dx @ dx)
+            intercept = ym - slope * xm
+        else:
+            slope = (x @ y) / (x @ x)
+            intercept = 0.0
         
         # 预测
-        y_pred = model.predict(X)
+        y_pred = slope * x + intercept
         
-        # 计算指标
-        mse = mean_squared_error(y, y_pred)
-        r2 = r2_score(y, y_pred)
+        # 计算指标（常数y时与sklearn的r2_score一致：完全拟合为1，否则为0）
+        resid = y - y_pred
+        ss_res = resid @ resid
+        ss_tot = ((y - ym) ** 2).sum()
+        mse = ss_res / len(y)
+        if ss_tot > 0:
+            r2 = 1.0 - ss_res / ss_tot
+        else:
+            r2 = 1.0 if ss_res == 0 else 0.0
         
         return {
-            "coefficients": model.coef_.tolist(),
-            "intercept": float(model.intercept_) if fit_intercept else 0.0,
-            "predictions": y_pred.tolist(),
+            "coefficients": [float(slope)],
+            "intercept": float(intercept),
+            "predictions": _to_payload(y_pred, as_list),
             "mse": float(mse),
             "r2_score": float(r2),
             "rmse": float(np.sqrt(mse)),
             "fit_intercept": fit_intercept
         }
     
-    def random_forest_analysis(self, data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+    @_memoize_fit
+    def random_forest_analysis(self, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
         """随机森林分析"""
         self._check_availability()
         
-        if len(data) < 2:
+        y = _as_f64(data)
+        if len(y) < 2:
             raise ValueError("Random Forest requires at least 2 data points")
         
         # 创建特征矩阵
-        X = np.arange(len(data)).reshape(-1, 1)
-        y = np.array(data)
+        X = np.arange(len(y)).reshape(-1, 1)
         
         # 获取参数
         n_estimators = int(params.get("n_estimators", "100"))
@@ -186,12 +274,17 @@ class AdvancedMLAlgorithms:
         if max_depth:
             max_depth = int(max_depth)
         random_state = int(params.get("random_state", "42"))
+        # 默认使用全部CPU核心并行训练各棵树；服务进程中可通过参数限制
+        n_jobs = int(params.get("n_jobs", "-1"))
         
-        # 执行随机森林回归
+        # 执行随机森林回归（bootstrap抽样才能计算袋外得分）
         model = RandomForestRegressor(
             n_estimators=n_estimators,
             max_depth=max_depth,
-            random_state=random_state
+            random_state=random_state,
+            n_jobs=n_jobs,
+            oob_score=True,
+            bootstrap=True
         )
         model.fit(X, y)
         
@@ -203,10 +296,11 @@ class AdvancedMLAlgorithms:
         r2 = r2_score(y, y_pred)
         
         return {
-            "predictions": y_pred.tolist(),
-            "feature_importances": model.feature_importances_.tolist(),
+            "predictions": y_pred,
+            "feature_importances": model.feature_importances_,
             "n_estimators": n_estimators,
             "max_depth": max_depth,
+            "n_jobs": n_jobs,
             "mse": float(mse),
             "r2_score": float(r2),
             "rmse": float(np.sqrt(mse)),
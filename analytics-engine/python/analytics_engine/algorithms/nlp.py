@@ -8,9 +8,103 @@ Production use should consider more sophisticated libraries.
 
 import re
 import math
-from typing import Dict, List, Any
+import heapq
+from typing import Dict, Any
 from collections import Counter
 import warnings
+import numpy as np
+
+from .basic_stats import ArrayLike
+
+# 延迟导入，处理可能的依赖缺失
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    warnings.warn("numba not available, levenshtein distance will use pure Python")
+
+# 预编译的分词/分句正则与情感词典（模块级常量，避免每次调用重建）
+_TOKEN_RE = re.compile(r'\b\w+\b')
+_SENT_RE = re.compile(r'[.!?]+')
+
+# 关键词提取的停用词表（简化版本）
+_STOPWORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during',
+    'before', 'after', 'above', 'below', 'out', 'off', 'over', 'under',
+    'again', 'further', 'then', 'once', 'here', 'there', 'when', 'where',
+    'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more', 'most',
+    'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same',
+    'so', 'than', 'too', 'very', 'can', 'will', 'just', 'should', 'now',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had'
+})
+
+_POS = frozenset({
+    'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic',
+    'awesome', 'perfect', 'love', 'like', 'happy', 'joy', 'pleased',
+    'satisfied', 'brilliant', 'outstanding', 'superb'
+})
+
+_NEG = frozenset({
+    'bad', 'terrible', 'awful', 'horrible', 'disgusting', 'hate',
+    'dislike', 'angry', 'sad', 'disappointed', 'frustrated', 'annoyed',
+    'upset', 'worried', 'concerned', 'poor', 'worst'
+})
+
+
+if NUMBA_AVAILABLE:
+    @njit(nogil=True, cache=True, boundscheck=False)
+    def _levenshtein_kernel(s1, s2):
+        """编辑距离DP，s1/s2为码点数组，要求 len(s1) >= len(s2)
+
+        两行int32缓冲区交替使用，避免逐行分配；三者取最小值以显式比较展开。
+        """
+        m = s2.shape[0]
+        prev = np.empty(m + 1, dtype=np.int32)
+        curr = np.empty(m + 1, dtype=np.int32)
+        for j in range(m + 1):
+            prev[j] = j
+        for i in range(s1.shape[0]):
+            c1 = s1[i]
+            curr[0] = i + 1
+            for j in range(m):
+                best = prev[j + 1] + 1
+                d = curr[j] + 1
+                if d < best:
+                    best = d
+                d = prev[j] + (1 if c1 != s2[j] else 0)
+                if d < best:
+                    best = d
+                curr[j + 1] = best
+            prev, curr = curr, prev
+        return prev[m]
+else:
+    def _levenshtein_kernel(s1: np.ndarray, s2: np.ndarray) -> int:
+        """纯Python回退实现：编辑距离DP，要求 len(s1) >= len(s2)"""
+        a = s1.tolist()
+        b = s2.tolist()
+        previous_row = list(range(len(b) + 1))
+        for i, c1 in enumerate(a):
+            current_row = [i + 1]
+            for j, c2 in enumerate(b):
+                current_row.append(min(previous_row[j + 1] + 1, current_row[j] + 1,
+                                       previous_row[j] + (c1 != c2)))
+            previous_row = current_row
+        return previous_row[-1]
+
+
+def _levenshtein_distance(s1: str, s2: str) -> int:
+    """计算两个字符串的编辑距离（按Unicode字符）"""
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    if len(s2) == 0:
+        return len(s1)
+    # UTF-32编码为定长码点数组，保持按字符而非按字节计算距离
+    a = np.frombuffer(s1.encode("utf-32-le"), dtype=np.uint32)
+    b = np.frombuffer(s2.encode("utf-32-le"), dtype=np.uint32)
+    return int(_levenshtein_kernel(a, b))
+
 
 class NLPAlgorithms:
     """自然语言处理算法实现"""
@@ -18,7 +112,7 @@ class NLPAlgorithms:
     def __init__(self):
         self.available = True  # 基础实现，不需要额外依赖
     
-    def sentiment_analysis(self, data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+    def sentiment_analysis(self, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
         """情感分析（简化版本）"""
         # 注意：这里data是数值列表，但NLP需要文本
         # 实际使用中应该传入文本数据
@@ -27,25 +121,15 @@ class NLPAlgorithms:
             raise ValueError("NLP sentiment analysis requires 'text' parameter")
         
         # 简单的情感词典方法
-        positive_words = {
-            'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic',
-            'awesome', 'perfect', 'love', 'like', 'happy', 'joy', 'pleased',
-            'satisfied', 'brilliant', 'outstanding', 'superb'
-        }
-        
-        negative_words = {
-            'bad', 'terrible', 'awful', 'horrible', 'disgusting', 'hate',
-            'dislike', 'angry', 'sad', 'disappointed', 'frustrated', 'annoyed',
-            'upset', 'worried', 'concerned', 'poor', 'worst'
-        }
-        
-        # 文本预处理
-        text_lower = text.lower()
-        words = re.findall(r'\b\w+\b', text_lower)
+        words = _TOKEN_RE.findall(text.lower())
         
-        # 计算情感分数
-        positive_count = sum(1 for word in words if word in positive_words)
-        negative_count = sum(1 for word in words if word in negative_words)
+        # 计算情感分数（单次遍历同时统计正负情感词）
+        positive_count = negative_count = 0
+        for word in words:
+            if word in _POS:
+                positive_count += 1
+            elif word in _NEG:
+                negative_count += 1
         total_words = len(words)
         
         if total_words == 0:
@@ -71,7 +155,7 @@ class NLPAlgorithms:
             "method": "lexicon_based"
         }
     
-    def text_similarity(self, data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+    def text_similarity(self, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
         """文本相似度计算"""
         text1 = params.get("text1", "")
         text2 = params.get("text2", "")
@@ -81,13 +165,8 @@ class NLPAlgorithms:
             raise ValueError("Text similarity requires 'text1' and 'text2' parameters")
         
         # 文本预处理
-        def preprocess_text(text):
-            text_lower = text.lower()
-            words = re.findall(r'\b\w+\b', text_lower)
-            return words
-        
-        words1 = preprocess_text(text1)
-        words2 = preprocess_text(text2)
+        words1 = _TOKEN_RE.findall(text1.lower())
+        words2 = _TOKEN_RE.findall(text2.lower())
         
         if method == "jaccard":
             # Jaccard相似度
@@ -98,17 +177,15 @@ class NLPAlgorithms:
             similarity = intersection / union if union > 0 else 0.0
             
         elif method == "cosine":
-            # 余弦相似度
-            all_words = list(set(words1 + words2))
-            
-            # 创建词频向量
-            vec1 = [words1.count(word) for word in all_words]
-            vec2 = [words2.count(word) for word in all_words]
+            # 余弦相似度（稀疏词频向量）
+            c1 = Counter(words1)
+            c2 = Counter(words2)
             
-            # 计算余弦相似度
-            dot_product = sum(a * b for a, b in zip(vec1, vec2))
-            magnitude1 = math.sqrt(sum(a * a for a in vec1))
-            magnitude2 = math.sqrt(sum(a * a for a in vec2))
+            # 点积只需遍历较小词表的键
+            small, large = (c1, c2) if len(c1) < len(c2) else (c2, c1)
+            dot_product = sum(count * large[word] for word, count in small.items())
+            magnitude1 = math.sqrt(sum(v * v for v in c1.values()))
+            magnitude2 = math.sqrt(sum(v * v for v in c2.values()))
             
             if magnitude1 == 0 or magnitude2 == 0:
                 similarity = 0.0
@@ -117,26 +194,7 @@ class NLPAlgorithms:
                 
         elif method == "levenshtein":
             # 编辑距离相似度
-            def levenshtein_distance(s1, s2):
-                if len(s1) < len(s2):
-                    return levenshtein_distance(s2, s1)
-                
-                if len(s2) == 0:
-                    return len(s1)
-                
-                previous_row = list(range(len(s2) + 1))
-                for i, c1 in enumerate(s1):
-                    current_row = [i + 1]
-                    for j, c2 in enumerate(s2):
-                        insertions = previous_row[j + 1] + 1
-                        deletions = current_row[j] + 1
-                        substitutions = previous_row[j] + (c1 != c2)
-                        current_row.append(min(insertions, deletions, substitutions))
-                    previous_row = current_row
-                
-                return previous_row[-1]
-            
-            distance = levenshtein_distance(text1, text2)
+            distance = _levenshtein_distance(text1, text2)
             max_len = max(len(text1), len(text2))
             similarity = 1 - (distance / max_len) if max_len > 0 else 1.0
             
@@ -152,7 +210,7 @@ class NLPAlgorithms:
             "total_unique_words": len(set(words1).union(set(words2)))
         }
     
-    def keyword_extraction(self, data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+    def keyword_extraction(self, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
         """关键词提取"""
         text = params.get("text", "")
         n_keywords = int(params.get("n_keywords", "5"))
@@ -163,28 +221,19 @@ class NLPAlgorithms:
         
         # 文本预处理
         text_lower = text.lower()
-        sentences = re.split(r'[.!?]+', text_lower)
+        sentences = _SENT_RE.split(text_lower)
         
-        # 移除停用词（简化版本）
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during',
-            'before', 'after', 'above', 'below', 'out', 'off', 'over', 'under',
-            'again', 'further', 'then', 'once', 'here', 'there', 'when', 'where',
-            'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more', 'most',
-            'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same',
-            'so', 'than', 'too', 'very', 'can', 'will', 'just', 'should', 'now',
-            'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had'
-        }
-        
-        # 提取所有单词
-        all_words = []
+        # 单次遍历：分词、过滤停用词，同时累计词频与文档频率（以句子为"文档"）
+        word_counts = Counter()
+        df = Counter()
         for sentence in sentences:
-            words = re.findall(r'\b\w+\b', sentence)
-            words = [word for word in words if word not in stop_words and len(word) > 2]
-            all_words.extend(words)
+            words = [word for word in _TOKEN_RE.findall(sentence)
+                     if word not in _STOPWORDS and len(word) > 2]
+            word_counts.update(words)
+            df.update(frozenset(words))
+        total_words = word_counts.total()
         
-        if not all_words:
+        if total_words == 0:
             return {
                 "keywords": [],
                 "scores": [],
@@ -194,27 +243,23 @@ class NLPAlgorithms:
         
         if method == "frequency":
             # 简单词频
-            word_counts = Counter(all_words)
             top_words = word_counts.most_common(n_keywords)
             keywords = [word for word, count in top_words]
             scores = [count for word, count in top_words]
             
         elif method == "tfidf":
             # 简化的TF-IDF
-            word_freq = Counter(all_words)
-            total_words = len(all_words)
+            n_sentences = len(sentences)
             
             # 计算TF-IDF分数
             tfidf_scores = {}
-            for word, freq in word_freq.items():
+            for word, freq in word_counts.items():
                 tf = freq / total_words
-                # 简化的IDF计算（假设文档中每个词都只出现在一个"文档"中）
-                idf = math.log(len(sentences) / (1 + sum(1 for s in sentences if word in s)))
+                idf = math.log(n_sentences / (1 + df[word]))
                 tfidf_scores[word] = tf * idf
             
-            # 获取top N关键词
-            sorted_words = sorted(tfidf_scores.items(), key=lambda x: x[1], reverse=True)
-            top_words = sorted_words[:n_keywords]
+            # 获取top N关键词（部分选择，无需全量排序）
+            top_words = heapq.nlargest(n_keywords, tfidf_scores.items(), key=lambda x: x[1])
             keywords = [word for word, score in top_words]
             scores = [score for word, score in top_words]
             
@@ -225,7 +270,7 @@ class NLPAlgorithms:
             "keywords": keywords,
             "scores": [float(score) for score in scores],
             "method": method,
-            "total_words": len(all_words),
-            "unique_words": len(set(all_words)),
+            "total_words": total_words,
+            "unique_words": len(word_counts),
             "n_keywords": len(keywords)
         } 
\ No newline at end of file
@@ -5,9 +5,13 @@ Contains Python implementations of time series analysis algorithms.
 """
 
 import numpy as np
-from typing import Dict, List, Any, Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, Any
 import warnings
 
+from ._kernels import pairwise_slopes_kernel
+from .basic_stats import ArrayLike, _as_f64, _to_payload
+
 # 延迟导入时间序列库
 try:
     from scipy import stats
@@ -17,6 +21,45 @@ except ImportError:
     SCIPY_AVAILABLE = False
     warnings.warn("scipy not available, time series algorithms will be limited")
 
+try:
+    from sklearn.ensemble import IsolationForest
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+    warnings.warn("scikit-learn not available, isolation anomaly detection will be approximated")
+
+
+def _moving_average(arr: np.ndarray, window: int) -> np.ndarray:
+    """居中移动平均，两端窗口截断；基于前缀和，单次线性遍历"""
+    n = len(arr)
+    if window >= n:
+        return np.full(n, np.mean(arr))
+    
+    idx = np.arange(n)
+    half = window // 2
+    starts = np.maximum(0, idx - half)
+    ends = np.minimum(n, idx + half + 1)
+    csum = np.concatenate(([0.0], np.cumsum(arr)))
+    return (csum[ends] - csum[starts]) / (ends - starts)
+
+
+def _mann_kendall_s(x: np.ndarray, y: np.ndarray) -> int:
+    """由Kendall tau-b推导Mann-Kendall S统计量（Knight算法，O(n log n)）
+
+    x 为严格递增的时间索引（无并列），tau_b = S / sqrt(n0 * (n0 - n2))，
+    其中 n0 = n(n-1)/2，n2 为y中并列值构成的元素对数。
+    """
+    n = len(y)
+    n0 = n * (n - 1) // 2
+    _, counts = np.unique(y, return_counts=True)
+    n2 = int((counts * (counts - 1) // 2).sum())
+    if n2 == n0:
+        # 所有元素对均并列（含少于2个点），tau_b无定义，S为0
+        return 0
+    tau = stats.kendalltau(x, y).statistic
+    return int(round(tau * np.sqrt(float(n0) * (n0 - n2))))
+
+
 class TimeSeriesAlgorithms:
     """时间序列分析算法实现"""
     
@@ -28,61 +71,55 @@ class TimeSeriesAlgorithms:
         if not self.available:
             raise RuntimeError("scipy not available for time series algorithms")
     
-    def arima_forecast(self, data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+    def arima_forecast(self, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
         """ARIMA时间序列预测（简化实现）"""
         # 注意：这是一个简化的ARIMA实现，生产环境建议使用statsmodels
         
+        data = _as_f64(data)
         if len(data) < 10:
             raise ValueError("ARIMA requires at least 10 data points")
         
-        y = np.array(data)
+        y = data
         
         # 获取参数
         order = params.get("order", "1,1,1")
         p, d, q = map(int, order.split(","))
         periods = int(params.get("periods", "5"))
+        as_list = params.get("as_list", "false").lower() == "true"
         
-        # 简化的差分处理
-        if d > 0:
-            for _ in range(d):
-                y = np.diff(y)
+        # 差分处理：记录每一阶差分前序列的末值，用于逆差分
+        diff_tails = []
+        for _ in range(d):
+            diff_tails.append(y[-1])
+            y = np.diff(y)
         
         # 简单的AR模型预测（作为ARIMA的简化版本）
         if len(y) >= p + 1:
-            # 使用最后p个值进行线性预测
-            X = np.column_stack([y[i:-(p-i)] for i in range(p)] if p > 0 else [y[:-1]])
-            y_target = y[p:]
-            
-            # 简单线性回归
-            if X.size > 0 and y_target.size > 0:
-                coeffs = np.linalg.lstsq(X, y_target, rcond=None)[0]
+            if p > 0:
+                # 滞后矩阵：第t行为 y[t:t+p]，滑动窗口视图零拷贝构造
+                X = sliding_window_view(y[:-1], p)
+                y_target = y[p:]
                 
-                # 预测未来值
-                forecast = []
-                last_values = y[-p:].tolist() if p > 0 else [y[-1]]
-                
-                for _ in range(periods):
-                    if p > 0:
-                        next_val = np.dot(coeffs, last_values[-p:])
-                    else:
-                        next_val = last_values[-1]  # 简单持续预测
-                    
-                    forecast.append(float(next_val))
-                    last_values.append(next_val)
+                # 简单线性回归
+                coeffs = np.linalg.lstsq(X, y_target, rcond=None)[0]
                 
-                # 如果进行了差分，需要逆向恢复
-                if d > 0:
-                    # 简化的逆差分
-                    base_value = data[-1]
-                    for i in range(len(forecast)):
-                        forecast[i] += base_value
+                # 预测未来值：预分配缓冲区，前p个为历史值，其后逐步写入预测值
+                buf = np.empty(p + periods)
+                buf[:p] = y[-p:]
+                for i in range(periods):
+                    buf[p + i] = coeffs @ buf[i:i + p]
+                forecast = buf[p:]
             else:
-                forecast = [data[-1]] * periods  # 回退到简单预测
+                forecast = np.full(periods, y[-1])  # 简单持续预测
+            
+            # 如果进行了差分，需要逆向恢复：从最高阶起逐阶累加，以该阶末值为起点
+            for tail in reversed(diff_tails):
+                forecast = tail + np.cumsum(forecast)
         else:
-            forecast = [data[-1]] * periods  # 回退到简单预测
+            forecast = np.full(periods, data[-1], dtype=np.float64)  # 回退到简单预测
         
         return {
-            "forecast": forecast,
+            "forecast": _to_payload(forecast, as_list),
             "order": [p, d, q],
             "periods": periods,
             "model": "simplified_arima",
@@ -91,33 +128,21 @@ class TimeSeriesAlgorithms:
             "bic": 0.0   # 简化版本不计算BIC
         }
     
-    def seasonal_decompose(self, data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+    def seasonal_decompose(self, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
         """季节性分解"""
-        if len(data) < 4:
+        y = _as_f64(data)
+        if len(y) < 4:
             raise ValueError("Seasonal decompose requires at least 4 data points")
         
-        y = np.array(data)
         period = int(params.get("period", "4"))
         model = params.get("model", "additive")  # additive or multiplicative
+        as_list = params.get("as_list", "false").lower() == "true"
         
         if len(y) < 2 * period:
             period = max(2, len(y) // 2)
         
-        # 简化的季节性分解
-        def moving_average(arr, window):
-            """移动平均"""
-            if window >= len(arr):
-                return np.full(len(arr), np.mean(arr))
-            
-            result = np.full(len(arr), np.nan)
-            for i in range(len(arr)):
-                start = max(0, i - window // 2)
-                end = min(len(arr), i + window // 2 + 1)
-                result[i] = np.mean(arr[start:end])
-            return result
-        
         # 趋势分量（移动平均）
-        trend = moving_average(y, period)
+        trend = _moving_average(y, period)
         
         # 去趋势化
         if model == "additive":
@@ -125,20 +150,14 @@ class TimeSeriesAlgorithms:
         else:  # multiplicative
             detrended = y / np.where(trend != 0, trend, 1)
         
-        # 季节性分量
-        seasonal = np.full(len(y), np.nan)
-        for i in range(period):
-            seasonal_indices = list(range(i, len(y), period))
-            if seasonal_indices:
-                seasonal_values = detrended[seasonal_indices]
-                seasonal_values = seasonal_values[~np.isnan(seasonal_values)]
-                if len(seasonal_values) > 0:
-                    season_avg = np.mean(seasonal_values)
-                    for idx in seasonal_indices:
-                        seasonal[idx] = season_avg
-        
-        # 填充NaN值
-        seasonal = np.where(np.isnan(seasonal), 0, seasonal)
+        # 季节性分量：按相位 idx % period 分组求均值（忽略NaN），全NaN的相位取0
+        phase = np.arange(len(y)) % period
+        valid = ~np.isnan(detrended)
+        season_sum = np.bincount(phase[valid], weights=detrended[valid], minlength=period)
+        season_cnt = np.bincount(phase[valid], minlength=period)
+        season_avg = np.divide(season_sum, season_cnt,
+                               out=np.zeros(period), where=season_cnt > 0)
+        seasonal = season_avg[phase]
         
         # 残差分量
         if model == "additive":
@@ -147,34 +166,30 @@ class TimeSeriesAlgorithms:
             residual = y / (trend * np.where(seasonal != 0, seasonal, 1))
         
         return {
-            "trend": np.nan_to_num(trend).tolist(),
-            "seasonal": seasonal.tolist(),
-            "residual": np.nan_to_num(residual).tolist(),
+            "trend": _to_payload(np.nan_to_num(trend), as_list),
+            "seasonal": _to_payload(seasonal, as_list),
+            "residual": _to_payload(np.nan_to_num(residual), as_list),
             "period": period,
             "model": model,
-            "original": y.tolist()
+            "original": _to_payload(y, as_list)
         }
     
-    def trend_analysis(self, data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+    def trend_analysis(self, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
         """趋势分析（Mann-Kendall检验）"""
         self._check_availability()
         
-        if len(data) < 3:
+        y = _as_f64(data)
+        if len(y) < 3:
             raise ValueError("Trend analysis requires at least 3 data points")
         
-        y = np.array(data)
         alpha = float(params.get("alpha", "0.05"))
         
-        # Mann-Kendall趋势检验
-        n = len(y)
-        s = 0
-        
-        for i in range(n - 1):
-            for j in range(i + 1, n):
-                if y[j] > y[i]:
-                    s += 1
-                elif y[j] < y[i]:
-                    s -= 1
+        # Mann-Kendall趋势检验：S = 同序对数 - 逆序对数
+        # 缺失值（NaN）不参与检验，保留其余点的原始时间索引
+        valid = ~np.isnan(y)
+        x = np.flatnonzero(valid)
+        n = len(x)
+        s = _mann_kendall_s(x, y[valid])
         
         # 计算方差
         var_s = (n * (n - 1) * (2 * n + 5)) / 18
@@ -202,14 +217,8 @@ class TimeSeriesAlgorithms:
             significant = False
         
         # 计算Theil-Sen斜率估计
-        slopes = []
-        for i in range(n - 1):
-            for j in range(i + 1, n):
-                if j != i:
-                    slope = (y[j] - y[i]) / (j - i)
-                    slopes.append(slope)
-        
-        if slopes:
+        slopes = pairwise_slopes_kernel(np.ascontiguousarray(y, dtype=np.float64))
+        if slopes.size > 0:
             theil_sen_slope = np.median(slopes)
         else:
             theil_sen_slope = 0.0
@@ -225,17 +234,18 @@ class TimeSeriesAlgorithms:
             "method": "mann_kendall"
         }
     
-    def anomaly_detection(self, data: List[float], params: Dict[str, str]) -> Dict[str, Any]:
+    def anomaly_detection(self, data: ArrayLike, params: Dict[str, str]) -> Dict[str, Any]:
         """异常检测"""
-        if len(data) < 3:
+        y = _as_f64(data)
+        if len(y) < 3:
             raise ValueError("Anomaly detection requires at least 3 data points")
         
-        y = np.array(data)
         method = params.get("method", "zscore")
         threshold = float(params.get("threshold", "2.0"))
+        as_list = params.get("as_list", "false").lower() == "true"
         
-        anomalies = []
-        scores = []
+        anomalies = np.empty(0, dtype=np.intp)
+        scores = np.empty(0, dtype=np.float64)
         
         if method == "zscore":
             # Z-score方法
@@ -245,51 +255,57 @@ class TimeSeriesAlgorithms:
             if std_val == 0:
                 z_scores = np.zeros(len(y))
             else:
-                z_scores = np.abs((y - mean_val) / std_val)
+                # 原地取绝对值并缩放，只分配一个临时数组
+                z_scores = y - mean_val
+                np.abs(z_scores, out=z_scores)
+                z_scores /= std_val
             
             anomaly_mask = z_scores > threshold
-            anomalies = np.where(anomaly_mask)[0].tolist()
-            scores = z_scores.tolist()
+            anomalies = np.flatnonzero(anomaly_mask)
+            scores = z_scores
             
         elif method == "iqr":
             # IQR方法
-            q1 = np.percentile(y, 25)
-            q3 = np.percentile(y, 75)
+            q1, q3 = np.percentile(y, [25, 75]).tolist()
             iqr = q3 - q1
             
             lower_bound = q1 - threshold * iqr
             upper_bound = q3 + threshold * iqr
             
             anomaly_mask = (y < lower_bound) | (y > upper_bound)
-            anomalies = np.where(anomaly_mask)[0].tolist()
+            anomalies = np.flatnonzero(anomaly_mask)
             
-            # 计算距离边界的距离作为分数
-            scores = []
-            for val in y:
-                if val < lower_bound:
-                    scores.append(float(lower_bound - val))
-                elif val > upper_bound:
-                    scores.append(float(val - upper_bound))
-                else:
-                    scores.append(0.0)
+            # 计算距离边界的距离作为分数（每个点至多一侧越界）
+            scores = np.maximum(lower_bound - y, 0.0) + np.maximum(y - upper_bound, 0.0)
                     
         elif method == "isolation":
-            # 简化的孤立森林方法
-            # 实际实现应该使用sklearn.ensemble.IsolationForest
-            mean_val = np.mean(y)
-            distances = np.abs(y - mean_val)
-            threshold_val = np.percentile(distances, (1 - threshold / 10) * 100)
-            
-            anomaly_mask = distances > threshold_val
-            anomalies = np.where(anomaly_mask)[0].tolist()
-            scores = distances.tolist()
+            # 孤立森林方法：threshold/10 为预期异常比例（与简化版本的分位数阈值一致）
+            contamination = threshold / 10
+            if SKLEARN_AVAILABLE:
+                X = y.reshape(-1, 1)
+                clf = IsolationForest(
+                    n_estimators=int(params.get("n_estimators", "100")),
+                    contamination=contamination if 0 < contamination <= 0.5 else "auto",
+                    n_jobs=int(params.get("n_jobs", "-1")),
+                    random_state=int(params.get("random_state", "42"))
+                )
+                clf.fit(X)
+                # score_samples越小越异常，取负使分数越大越异常
+                scores = -clf.score_samples(X)
+                anomalies = np.flatnonzero(clf.predict(X) == -1)
+            else:
+                # 回退：按到均值的距离取分位数阈值
+                distances = np.abs(y - np.mean(y))
+                threshold_val = np.percentile(distances, (1 - contamination) * 100)
+                anomalies = np.flatnonzero(distances > threshold_val)
+                scores = distances
         
         return {
-            "anomalies": anomalies,
-            "scores": scores,
+            "anomalies": _to_payload(anomalies, as_list),
+            "scores": _to_payload(scores, as_list),
             "method": method,
             "threshold": threshold,
             "n_anomalies": len(anomalies),
-            "anomaly_rate": len(anomalies) / len(data),
-            "data_length": len(data)
+            "anomaly_rate": len(anomalies) / len(y),
+            "data_length": len(y)
         } 
\ No newline at end of file
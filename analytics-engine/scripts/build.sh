@@ -107,6 +107,44 @@ build_python() {
     fi
 }
 
+# 打包Python wheel（如果启用）
+package_python() {
+    if [[ "${FEATURES}" == *"python-bridge"* ]]; then
+        echo -e "${BLUE}📦 Packaging Python wheel...${NC}"
+        
+        # 可选：AOT预编译数值内核，随wheel分发（运行时需同样设置ANALYTICS_ENGINE_USE_AOT=1）
+        local aot_built=false
+        if [[ "${ANALYTICS_ENGINE_USE_AOT}" == "1" ]]; then
+            echo -e "${YELLOW}⚙️  Precompiling Numba kernels (AOT)...${NC}"
+            if (cd python && python -m analytics_engine.algorithms._build_kernels); then
+                aot_built=true
+            else
+                echo -e "${YELLOW}⚠️  AOT kernel build failed, packaging JIT-only wheel${NC}"
+            fi
+        fi
+        
+        local maturin_args=""
+        if [[ "${BUILD_MODE}" == "release" ]]; then
+            maturin_args="--release"
+        fi
+        local status=0
+        maturin build ${maturin_args} || status=$?
+        
+        # AOT模块只进入wheel，不留在源码树中
+        if [[ "${aot_built}" == "true" ]]; then
+            rm -f python/analytics_engine/algorithms/_kernels_aot*.so
+        fi
+        if [[ ${status} -ne 0 ]]; then
+            echo -e "${RED}❌ maturin build failed${NC}"
+            return ${status}
+        fi
+        
+        echo -e "${GREEN}✅ Python wheel packaged: target/wheels/${NC}"
+    else
+        echo -e "${YELLOW}⏭️  Python bridge disabled, skipping wheel packaging${NC}"
+    fi
+}
+
 # 运行测试
 run_tests() {
     if [[ "${SKIP_TESTS}" != "true" ]]; then
@@ -169,6 +207,7 @@ main() {
     build_rust
     build_python
     run_tests
+    package_python
     generate_build_info
     
     echo -e "${GREEN}🎉 Build completed successfully!${NC}"
@@ -1,6 +1,6 @@
 use anyhow::{Result, anyhow};
 use pyo3::prelude::*;
-use pyo3::types::{PyDict, PyList};
+use pyo3::types::{PyBytes, PyDict};
 use std::collections::HashMap;
 use tracing::{debug, warn, info};
 use crate::api::{AnalysisRequest, AnalysisResult, ExecutionMetadata, AlgorithmInfo};
@@ -25,6 +25,13 @@ pub async fn analyze_python(request: &AnalysisRequest) -> Result<AnalysisResult>
 fn execute_python_analysis(request: &AnalysisRequest) -> Result<AnalysisResult> {
     let start = std::time::Instant::now();
     
+    // 转换数据：以原生字节序的f64缓冲区传递，Python端通过np.frombuffer零拷贝映射。
+    // 在获取GIL之前完成，避免持锁期间做纯Rust工作。
+    // 注意：整个分析调用都在with_gil内执行，多个spawn_blocking线程之间仍按GIL串行。
+    let data_bytes: Vec<u8> = request.data.iter()
+        .flat_map(|v| v.to_ne_bytes())
+        .collect();
+    
     Python::with_gil(|py| {
         // 导入analytics_engine.algorithms模块
         let algorithms_module = py.import("analytics_engine.algorithms")?;
@@ -32,8 +39,7 @@ fn execute_python_analysis(request: &AnalysisRequest) -> Result<AnalysisResult>
         // 获取分析函数
         let analyze_func = algorithms_module.getattr("analyze")?;
         
-        // 转换数据
-        let data_list = PyList::new(py, &request.data);
+        let data_buf = PyBytes::new(py, &data_bytes);
         let params_dict = PyDict::new(py);
         for (key, value) in &request.params {
             params_dict.set_item(key, value)?;
@@ -42,7 +48,7 @@ fn execute_python_analysis(request: &AnalysisRequest) -> Result<AnalysisResult>
         // 调用Python函数
         let result = analyze_func.call1((
             request.algorithm.clone(),
-            data_list,
+            data_buf,
             params_dict,
         ))?;
         